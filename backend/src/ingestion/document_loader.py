@@ -1,11 +1,14 @@
 import os 
+import mmap 
+from functools import partial 
 from pathlib import Path 
-from typing import List, Dict, Optional 
+from typing import List, Dict, Optional, Iterator, Callable 
 from dataclasses import dataclass 
 from datetime import datetime 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor 
 
 
-@dataclass
+@dataclass(slots=True)
 class Document: 
     content: str 
     metadata: Dict[str, any] 
@@ -18,6 +21,9 @@ class Document:
 class DocumentLoader: 
     SUPPORTED_EXTENSIONS = {'.md', '.txt', '.pdf', '.docx', '.doc'}
 
+    # Joins extracted PDF pages, both in loaded documents and when streaming pages into a chunker
+    PAGE_SEPARATOR = "\n" 
+
     def __init__(self, data_dir: Optional[str] = None): 
         if data_dir is None:
             script_dir = Path(__file__).parent
@@ -27,10 +33,6 @@ class DocumentLoader:
 
     def load_file(self, filepath:str) -> Optional[Document]: 
         path = Path(filepath) 
-
-        if not path.exists(): 
-            print(f"File not found: {path}") 
-            return None 
         
         extension = path.suffix.lower() 
 
@@ -44,12 +46,19 @@ class DocumentLoader:
             elif extension == '.pdf': 
                 return self._load_pdf_file(path) 
         except Exception as e: 
-            print(f"Error loading{filepath}: {e}") 
+            self._report_load_error(path, e) 
             return None 
+
+    def _report_load_error(self, path: Path, error: Exception) -> None: 
+        """Shared by every loading path so they all report failures the same way""" 
+        if isinstance(error, FileNotFoundError): 
+            print(f"File not found: {path}") 
+        else: 
+            print(f"Error loading {path}: {error}") 
     
     def _load_text_file(self, path: Path) -> Document: 
-            with open(path, 'r', encoding='utf-8') as f: 
-                content = f.read() 
+            content = path.read_text(encoding='utf-8') 
+            st = path.stat() 
             
             title = path.stem 
             lines = content.split('\n') 
@@ -59,9 +68,9 @@ class DocumentLoader:
             metadata = {
                 'title': title, 
                 'file_type': path.suffix,
-                'file_size': path.stat().st_size, 
-                'created_at': datetime.fromtimestamp(path.stat().st_ctime),
-                'modified_at': datetime.fromtimestamp(path.stat().st_mtime)
+                'file_size': st.st_size, 
+                'created_at': datetime.fromtimestamp(st.st_ctime),
+                'modified_at': datetime.fromtimestamp(st.st_mtime)
             } 
 
             return Document(content=content, metadata=metadata, source=str(path)) 
@@ -73,42 +82,151 @@ class DocumentLoader:
             print("pypdf not installed") 
             return None 
         
-        reader = PdfReader(path) 
-        content = "" 
+        # pypdf seeks around the xref table a lot, so read it through a memory map rather than
+        # read() calls. Pages are extracted sequentially: pypdf is pure Python so threads would
+        # just contend for the GIL, and load_directory already parses files in separate processes
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm: 
+            st = os.fstat(f.fileno()) 
+            reader = PdfReader(mm) 
+            page_count = len(reader.pages) 
 
-        for page in reader.pages:
-            content += page.extract_text() + "\n" 
-        
-        metadata = {
+            content = self.PAGE_SEPARATOR.join(page.extract_text() or "" for page in reader.pages) 
+
+        metadata = self._pdf_metadata(path, st, page_count) 
+
+        return Document(content=content, metadata=metadata, source=str(path)) 
+
+    def _pdf_metadata(self, path: Path, st: os.stat_result, page_count: int) -> Dict[str, any]: 
+        return {
             'title': path.stem, 
             'file_type': 'pdf',
-            'page_count': len(reader.pages), 
-            'file_size': path.stat().st_size, 
-            'created_at': datetime.fromtimestamp(path.stat().st_ctime),
+            'page_count': page_count, 
+            'file_size': st.st_size, 
+            'created_at': datetime.fromtimestamp(st.st_ctime),
         }
 
-        return Document(content=content, metadata=metadata, source=str(path)) 
+    def iter_document_chunks(self, filepath: str, chunker) -> Iterator: 
+        """
+        Yield chunks of a single file without materializing its full text. PDFs are
+        extracted and chunked page by page through chunker.chunk_stream, so peak memory
+        is bounded by a page plus the chunk being built; other files are loaded as usual.
+        The chunks are the same as chunking the Document from load_file.
+
+        Errors are reported like load_file does. If a PDF page fails to extract, the
+        chunks before it have already been yielded and the rest of the file is skipped.
+        """
+        path = Path(filepath) 
+
+        if path.suffix.lower() != '.pdf': 
+            doc = self.load_file(path) 
+            if doc: 
+                yield from chunker.chunk_text(doc.content, doc.metadata) 
+            return 
+
+        try: 
+            yield from self._iter_pdf_chunks(path, chunker) 
+        except Exception as e: 
+            self._report_load_error(path, e) 
+
+    def _iter_pdf_chunks(self, path: Path, chunker) -> Iterator: 
+        try:
+            from pypdf import PdfReader 
+        except ImportError: 
+            print("pypdf not installed") 
+            return 
+
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm: 
+            reader = PdfReader(mm) 
+            metadata = self._pdf_metadata(path, os.fstat(f.fileno()), len(reader.pages)) 
+            pages = (page.extract_text() or "" for page in reader.pages) 
+
+            yield from chunker.chunk_stream(pages, metadata, joiner=self.PAGE_SEPARATOR) 
+
+    def _chunk_file(self, filepath: str, chunker) -> List: 
+        """Chunks of one file, or none if any part of it fails to load (like load_file)""" 
+        path = Path(filepath) 
+
+        if path.suffix.lower() != '.pdf': 
+            return list(self.iter_document_chunks(path, chunker)) 
+
+        try: 
+            return list(self._iter_pdf_chunks(path, chunker)) 
+        except Exception as e: 
+            self._report_load_error(path, e) 
+            return [] 
+
+    def _find_files(self, directory: Path) -> List[str]: 
+        # os.walk filters on names from the directory listing, so only matching files are ever opened
+        paths = [] 
+
+        for root, _, files in os.walk(directory): 
+            for name in files: 
+                if os.path.splitext(name)[1].lower() in self.SUPPORTED_EXTENSIONS: 
+                    paths.append(os.path.join(root, name)) 
+
+        return paths 
+
+    def _map_files(self, fn: Callable, paths: List[str]) -> List: 
+        """Apply fn to every path in parallel, returning results in the order of paths""" 
+        # PDF parsing is CPU bound so it goes to processes, text files are I/O bound so threads are enough
+        pdf_paths = [p for p in paths if p.lower().endswith('.pdf')] 
+        text_paths = [p for p in paths if not p.lower().endswith('.pdf')] 
+
+        # Never start more workers than there are files for them
+        cpu_count = os.cpu_count() or 1 
+        results = {} 
+
+        if pdf_paths: 
+            with ProcessPoolExecutor(max_workers=min(len(pdf_paths), cpu_count)) as ex: 
+                results.update(zip(pdf_paths, ex.map(fn, pdf_paths))) 
+
+        if text_paths: 
+            with ThreadPoolExecutor(max_workers=min(len(text_paths), cpu_count)) as ex: 
+                results.update(zip(text_paths, ex.map(fn, text_paths))) 
+
+        return [results[path] for path in paths] 
+
+    def _resolve_directory(self, directory: Optional[str]) -> Optional[Path]: 
+        directory = self.data_dir if directory is None else Path(directory) 
+
+        if not directory.exists(): 
+            print(f"Directory not found: {directory}") 
+            return None 
+
+        return directory 
     
     def load_directory(self, directory: Optional[str] = None) -> List[Document]: 
+        directory = self._resolve_directory(directory) 
         if directory is None: 
-            directory = self.data_dir 
-        else: 
-            directory = Path(directory) 
-        
-        if not directory.exists(): 
-            print(f"Directory not found: {directory}") 
             return [] 
-        
+
         documents = [] 
 
-        for file in directory.rglob('*'): 
-            if file.is_file() and file.suffix.lower() in self.SUPPORTED_EXTENSIONS: 
-                doc = self.load_file(file) 
-                if doc: 
-                    documents.append(doc) 
-                    print(f"Loaded: {doc.metadata['title']}") 
+        for doc in self._map_files(self.load_file, self._find_files(directory)): 
+            if doc: 
+                documents.append(doc) 
+                print(f"Loaded: {doc.metadata['title']}") 
         
         return documents 
+
+    def load_directory_chunks(self, chunker, directory: Optional[str] = None) -> List: 
+        """
+        Load and chunk every supported file without keeping the loaded documents around.
+        PDFs are streamed page by page into the chunker, so only the chunks are ever held
+        in full. Gives the same chunks as chunker.chunk_documents(self.load_directory()).
+        """
+        directory = self._resolve_directory(directory) 
+        if directory is None: 
+            return [] 
+
+        chunks = [] 
+
+        for file_chunks in self._map_files(partial(self._chunk_file, chunker=chunker), self._find_files(directory)): 
+            if file_chunks: 
+                chunks.extend(file_chunks) 
+                print(f"Loaded: {file_chunks[0].metadata['title']}") 
+
+        return chunks 
     
     def get_stats(self, documents: List[Document]) -> Dict[str, any]: 
         if not documents: 
@@ -1,53 +1,191 @@
-from typing import List, Union 
+import os 
+from typing import List, Dict, Union, Optional 
 import numpy as np 
 from sentence_transformers import SentenceTransformer 
 import time 
+from embedding_cache import EmbeddingCache 
+
+# Quantized weights shipped alongside the model on the Hub, per backend.
+# Each backend falls back to its unquantized FP32 export if these can't be used.
+QUANTIZED_MODEL_FILES = {
+    "onnx": "onnx/model_qint8_avx512_vnni.onnx",
+    "openvino": "openvino/openvino_model_qint8_quantized.xml",
+}
+
+# Encoding throughput stops improving beyond a handful of intra-op threads
+DEFAULT_CPU_THREADS = min(os.cpu_count() or 4, 8) 
+
+
+def _cpu_supports_vnni() -> bool: 
+    try: 
+        with open("/proc/cpuinfo") as f: 
+            return "avx512_vnni" in f.read() 
+    except OSError: 
+        return False 
+
 
 class Embedder: 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"): 
-        print(f"Initializing Embedder with model: {model_name}") 
-        self.model = SentenceTransformer(model_name) 
+    def __init__(
+        self, 
+        model_name: str = "all-MiniLM-L6-v2", 
+        backend: str = "onnx", 
+        use_cache: bool = True, 
+        cache_path: Optional[str] = None, 
+        cpu_threads: Optional[int] = DEFAULT_CPU_THREADS 
+    ): 
+        """
+        Args:
+            model_name: sentence-transformers model to load
+            backend: "onnx", "openvino" or "torch". The first two load int8 quantized weights when available
+            use_cache: Reuse embeddings of previously seen chunk texts from the on-disk cache
+            cache_path: SQLite file for the cache (defaults to data/processed/embedding_cache.db)
+            cpu_threads: Intra-op threads for the backend's CPU runtime, None leaves its defaults alone (e.g. on GPU)
+        """
+        print(f"Initializing Embedder with model: {model_name} ({backend} backend)") 
+        self.model_name = model_name 
+        self.backend = backend 
+        self.cpu_threads = cpu_threads 
+        self.model = self._load_model(model_name, backend) 
+
+        # Quantized and FP32 weights of the same model give different vectors, so cached
+        # embeddings are keyed by the weights actually loaded, not just the model name
+        self.cache_key = f"{model_name}|{self.loaded_weights}" 
         self.dimension = self.model.get_sentence_embedding_dimension() 
         print(f"Model loaded successfully. Dimension: {self.dimension}") 
 
+        self.cache = EmbeddingCache(cache_path) if use_cache else None 
+
+    def _thread_model_kwargs(self, backend: str) -> Dict: 
+        """Apply cpu_threads to whichever runtime the backend runs on""" 
+        if self.cpu_threads is None: 
+            return {} 
+
+        if backend == "onnx": 
+            import onnxruntime 
+
+            session_options = onnxruntime.SessionOptions() 
+            session_options.intra_op_num_threads = self.cpu_threads 
+            session_options.inter_op_num_threads = 1 
+            return {"session_options": session_options} 
+
+        if backend == "openvino": 
+            return {"ov_config": {"INFERENCE_NUM_THREADS": self.cpu_threads}} 
+
+        import torch 
+
+        torch.set_num_threads(self.cpu_threads) 
+        try: 
+            torch.set_num_interop_threads(1) 
+        except RuntimeError: 
+            # Can only be set once per process, before any inter-op work has run
+            pass 
+        return {} 
+
+    def _load_model(self, model_name: str, backend: str) -> SentenceTransformer: 
+        thread_kwargs = self._thread_model_kwargs(backend) 
+
+        if backend == "torch": 
+            self.loaded_weights = "torch" 
+            return SentenceTransformer(model_name) 
+
+        quantized_file = QUANTIZED_MODEL_FILES.get(backend) 
+        if backend == "onnx" and not _cpu_supports_vnni(): 
+            quantized_file = None 
+
+        if quantized_file: 
+            try: 
+                model = SentenceTransformer(
+                    model_name,
+                    backend = backend,
+                    model_kwargs = {"file_name": quantized_file, **thread_kwargs},
+                )
+                self.loaded_weights = f"{backend}:{quantized_file}" 
+                return model 
+            except Exception as e: 
+                print(f"Could not load quantized weights ({quantized_file}): {e}") 
+
+        print(f"Falling back to FP32 {backend} weights") 
+        self.loaded_weights = f"{backend}:fp32" 
+        return SentenceTransformer(model_name, backend = backend, model_kwargs = thread_kwargs) 
+
     def embed_text(self, text:str) -> np.ndarray: 
         return self.model.encode(text, convert_to_numpy = True) 
     
     def embed_batch(self, texts: List[str], batch_size: int = 32, show_progress: bool = True) -> np.ndarray: 
+        """
+        Encode the whole list in one call so encode's smart batching applies: it sorts
+        texts by length so each mini-batch only pads to similar lengths, and restores the
+        input order itself. Embeddings are returned as float16, which halves their size
+        and doesn't meaningfully change cosine similarity.
+        """
+        if not texts: 
+            return np.empty((0, self.dimension), dtype = np.float16) 
 
         return self.model.encode(
             texts,
             batch_size = batch_size,
             show_progress_bar = show_progress,
             convert_to_numpy = True,
-        )
+        ).astype(np.float16) 
     
-    def embed_chunks(self, chunks: List)-> List[np.ndarray]: 
+    def embed_chunks(self, chunks: List)-> np.ndarray: 
+        """Embed chunk texts into a single (num_chunks, dimension) array, in chunk order""" 
         texts = [chunk.text for chunk in chunks] 
 
         print(f"\n Generating embeddings for {len(texts)} chunks...") 
         start_time = time.time() 
 
-        embeddings = self.embed_batch(texts) 
+        if self.cache is None: 
+            embeddings = self.embed_batch(texts) 
+        else: 
+            embeddings = self._embed_with_cache(texts) 
 
         end_time = time.time() 
         duration = end_time - start_time 
 
         print(f"\n Embedding completed in {duration:.2f} seconds") 
         return embeddings 
+
+    def _embed_with_cache(self, texts: List[str]) -> np.ndarray: 
+        hashes = [EmbeddingCache.hash_text(text) for text in texts] 
+        cached = self.cache.get_many(hashes, self.cache_key) 
+
+        embeddings = np.empty((len(texts), self.dimension), dtype = np.float16) 
+
+        # Hash of each missed text -> every index holding that text, so repeated
+        # texts (e.g. boilerplate sections) are embedded and stored once
+        misses = {} 
+
+        for i, h in enumerate(hashes): 
+            if h in cached: 
+                embeddings[i] = cached[h] 
+            else: 
+                misses.setdefault(h, []).append(i) 
+
+        miss_count = sum(len(indices) for indices in misses.values()) 
+        print(f"Embedding cache: {len(texts) - miss_count} hits, {miss_count} misses ({len(misses)} unique)") 
+
+        if misses: 
+            miss_hashes = list(misses) 
+            miss_embeddings = self.embed_batch([texts[misses[h][0]] for h in miss_hashes]) 
+
+            for h, embedding in zip(miss_hashes, miss_embeddings): 
+                embeddings[misses[h]] = embedding 
+
+            self.cache.put_many(miss_hashes, self.cache_key, miss_embeddings) 
+
+        return embeddings 
     
 if __name__ == "__main__": 
     from document_loader import DocumentLoader 
     from text_chunker import TextChunker 
 
-    print("Step 1: Loading documents...") 
+    print("Step 1: Loading and chunking documents...") 
     loader = DocumentLoader() 
-    docs = loader.load_directory() 
-
-    print(f"Step 2: Loaded {len(docs)} documents") 
-
     chunker = TextChunker(chunk_size=512, chunk_overlap=50) 
-    chunks = chunker.chunk_documents(docs) 
+    chunks = loader.load_directory_chunks(chunker) 
+
+    print(f"Step 2: Loaded {len(chunks)} chunks") 
 
     embedder = Embedder() 
     embeddings = embedder.embed_chunks(chunks) 
@@ -57,8 +195,8 @@ if __name__ == "__main__":
     print(f"\n{'='*60}")
     print("Embedding Summary")
     print(f"{'='*60}")
-    print(f"Total embeddings: {len(embeddings)}")
-    print(f"Embedding dimension: {embeddings[0].shape}")
+    print(f"Total embeddings: {embeddings.shape[0]}")
+    print(f"Embedding dimension: {embeddings.shape[1]}")
     print(f"Total size in memory: {embeddings.nbytes / 1024 / 1024:.2f} MB")
     
     print(f"\n{'='*60}")
@@ -0,0 +1,75 @@
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Optional
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of chunk embeddings keyed by sha256(text) and model name,
+    so unchanged chunks are not re-embedded on every ingestion run.
+    """
+
+    # Stay under SQLite's default limit on bound parameters per statement
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            script_dir = Path(__file__).parent
+            self.db_path = script_dir.parent.parent / "data" / "processed" / "embedding_cache.db"
+        else:
+            self.db_path = Path(db_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                hash BLOB NOT NULL,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vec BLOB NOT NULL,
+                PRIMARY KEY (hash, model)
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def hash_text(text: str) -> bytes:
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    def get_many(self, hashes: List[bytes], model: str) -> Dict[bytes, np.ndarray]:
+        """Return the cached embeddings for whichever hashes are present"""
+        found = {}
+        unique = list(set(hashes))
+
+        for i in range(0, len(unique), self.QUERY_BATCH_SIZE):
+            batch = unique[i:i+self.QUERY_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+
+            rows = self.conn.execute(
+                f"SELECT hash, dim, vec FROM embedding_cache WHERE model = ? AND hash IN ({placeholders})",
+                [model, *batch]
+            )
+
+            for h, dim, vec in rows:
+                # Rows written before embeddings moved to float16 are still float32
+                dtype = np.float16 if len(vec) == dim * 2 else np.float32
+                found[h] = np.frombuffer(vec, dtype=dtype, count=dim)
+
+        return found
+
+    def put_many(self, hashes: List[bytes], model: str, embeddings: np.ndarray) -> None:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float16)
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (hash, model, dim, vec) VALUES (?, ?, ?, ?)",
+            [(h, model, emb.shape[0], emb.tobytes()) for h, emb in zip(hashes, embeddings)]
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
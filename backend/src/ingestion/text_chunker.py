@@ -1,10 +1,14 @@
-from typing import List, Dict 
+from typing import List, Dict, Tuple, Iterable, Iterator 
 from dataclasses import dataclass 
 import re 
+import numpy as np 
 from document_loader import Document 
 
+# Greedy match up to the last sentence boundary, so the remaining tail is the last sentence
+_LAST_SENTENCE_BOUNDARY = re.compile(r'.*[.!?]\s+', re.DOTALL) 
 
-@dataclass 
+
+@dataclass(slots=True) 
 class Chunk: 
     text: str 
     metadata: Dict 
@@ -42,40 +46,97 @@ class TextChunker:
         if metadata is None: 
             metadata = {} 
 
-        sections = text.split(self.separator) 
+        chunk_texts, _, _ = self._pack(self._split_sections(text), "", flush=True) 
 
-        chunks = [] 
-        current_chunk = "" 
+        return [
+            self._create_chunk(chunk_text, metadata, chunk_index) 
+            for chunk_index, chunk_text in enumerate(chunk_texts)
+        ]
+
+    def chunk_stream(self, texts: Iterable[str], metadata: Dict = None, joiner: str = "") -> Iterator[Chunk]: 
+        """
+        Chunk a document that arrives in pieces (e.g. PDF pages), yielding each chunk as
+        soon as it can't grow any further. Produces exactly the chunks of
+        chunk_text(joiner.join(texts)), but only the text after the last complete
+        section and the sections of the unfinished chunk are held between pieces.
+        """
+        if metadata is None: 
+            metadata = {} 
+
+        pending = [] 
+        carry = "" 
+        overlap = "" 
         chunk_index = 0 
 
-        for section in sections: 
-            section = section.strip() 
-            if not section: 
-                continue 
+        for i, text in enumerate(texts): 
+            # A separator can straddle two pieces, so split the unfinished tail together with the new piece
+            parts = (carry + joiner + text if i else text).split(self.separator) 
+            carry = parts.pop() 
+            pending.extend(s for s in (part.strip() for part in parts) if s) 
 
-            if len(current_chunk) + len(section) > self.chunk_size_chars and current_chunk:
-                chunks.append(self._create_chunk(current_chunk, metadata, chunk_index))
+            chunk_texts, consumed, overlap = self._pack(pending, overlap, flush=False) 
+            del pending[:consumed] 
+
+            for chunk_text in chunk_texts: 
+                yield self._create_chunk(chunk_text, metadata, chunk_index) 
                 chunk_index += 1 
 
-                current_chunk = self._get_overlap(section, current_chunk) + section 
-            else: 
-                if current_chunk: 
-                    current_chunk += self.separator + section 
-                else: 
-                    current_chunk = section 
+        pending.extend(self._split_sections(carry)) 
 
-        if current_chunk: 
-            chunks.append(self._create_chunk(current_chunk, metadata, chunk_index)) 
-        
-        return chunks 
+        chunk_texts, _, _ = self._pack(pending, overlap, flush=True) 
+        for chunk_text in chunk_texts: 
+            yield self._create_chunk(chunk_text, metadata, chunk_index) 
+            chunk_index += 1 
+
+    def _split_sections(self, text: str) -> List[str]: 
+        return [s for s in (section.strip() for section in text.split(self.separator)) if s] 
+
+    def _pack(self, sections: List[str], overlap: str, flush: bool) -> Tuple[List[str], int, str]: 
+        """
+        Greedily pack sections into chunk texts, each prefixed with the overlap from the previous one.
+        Unless flush is set, the last chunk is left unpacked since later sections could still join it.
+
+        Returns the chunk texts, the number of sections consumed and the overlap for the next chunk.
+        """
+        if not sections: 
+            return [], 0, overlap 
+
+        sep_len = len(self.separator) 
+
+        # cum[j] - cum[start-1] - sep_len is the joined length of sections[start:j+1],
+        # so each cut point is a single binary search instead of growing a string
+        lens = np.fromiter((len(s) + sep_len for s in sections), dtype=np.int64, count=len(sections)) 
+        cum = np.cumsum(lens) 
+
+        chunk_texts = [] 
+        start = 0 
+
+        while start < len(sections): 
+            prefix_len = len(overlap) + sep_len if overlap else 0 
+            consumed = cum[start - 1] if start > 0 else 0 
+            limit = self.chunk_size_chars - prefix_len + consumed + sep_len 
+
+            # Always take at least one section, even if it alone exceeds the chunk size
+            end = max(int(np.searchsorted(cum, limit, side='right')), start + 1) 
+
+            if end == len(sections) and not flush: 
+                break 
+
+            body = self.separator.join(sections[start:end]) 
+            chunk_text = overlap + self.separator + body if overlap else body 
+
+            chunk_texts.append(chunk_text) 
+
+            overlap = self._get_overlap(chunk_text) 
+            start = end 
+
+        return chunk_texts, start, overlap 
     
     def _create_chunk(self, text: str, metadata: Dict, index: int) -> Chunk: 
         """ Create a chunk object w metadata""" 
-        chunk_metadata = {
-            **metadata,
-            'chunk_index': index, 
-            'chunk_size': len(text)
-        }
+        chunk_metadata = metadata.copy() 
+        chunk_metadata['chunk_index'] = index 
+        chunk_metadata['chunk_size'] = len(text) 
 
         return Chunk(
             text=text.strip(),
@@ -85,14 +146,17 @@ class TextChunker:
 
     def _get_overlap(self, text: str) -> str: 
         """ Get overlap between current chunk and next section""" 
+        if self.chunk_overlap_chars <= 0: 
+            return "" 
+
         if len(text) <= self.chunk_overlap_chars: 
             return text 
         
         overlap = text[-self.chunk_overlap_chars:] 
 
-        sentences = re.split(r'[.!?]\s+', overlap) 
-        if len(sentences) > 1: 
-            return sentences[-1]
+        boundary = _LAST_SENTENCE_BOUNDARY.match(overlap) 
+        if boundary: 
+            return overlap[boundary.end():]
         
         return overlap 
     
@@ -124,15 +188,10 @@ if __name__ == "__main__":
 
     from document_loader import DocumentLoader 
 
-    print("Loading documents...") 
+    print("Loading and chunking documents...") 
     loader = DocumentLoader() 
-    docs = loader.load_directory() 
-
-    print(f"Loaded {len(docs)} documents") 
-
-    print("\nChunking documents...") 
     chunker = TextChunker(chunk_size=512, chunk_overlap=50) 
-    chunks = chunker.chunk_documents(docs) 
+    chunks = loader.load_directory_chunks(chunker) 
 
     print(f"\n{'='*60}") 
     print("Chunking Summary:") 
@@ -1,6 +1,9 @@
 from typing import List, Dict, Optional 
 import time 
+import hashlib 
+from collections import OrderedDict 
 from dataclasses import dataclass
+import numpy as np 
 
 @dataclass 
 class RAGResult: 
@@ -21,13 +24,28 @@ class RAGPipeline:
         vector_store, 
         embedder, 
         use_llm: bool = False, 
-        llm_client = None 
+        llm_client = None, 
+        query_cache_size: int = 1024, 
+        query_cache_similarity: float = 0.97 
     ): 
         self.vector_store = vector_store 
         self.embedder = embedder 
         self.use_llm = use_llm 
         self.llm_client = llm_client 
 
+        # Recent queries: hash of the text -> slot. Each slot holds the normalized embedding
+        # (a row of one preallocated matrix) and {top_k: search results}. Exact repeats skip
+        # the embedding forward pass, near-duplicates reuse the search results. Results are
+        # dropped whenever the vector store's generation changes
+        self.query_cache_size = query_cache_size 
+        self.query_cache_similarity = query_cache_similarity 
+        self._query_cache = OrderedDict() 
+        self._cache_embeddings = None 
+        self._slot_results = [None] * query_cache_size 
+        self._cache_generation = None 
+        self._cache_lookups = 0 
+        self._cache_hits = 0 
+
         if use_llm and llm_client is None: 
             raise ValueError("llm_client is required when use_llm is True") 
 
@@ -36,41 +54,43 @@ class RAGPipeline:
         query_text: str, 
         top_k: int = 5, 
         similarity_threshold: float = 0.7, 
-    ): 
+    ) -> RAGResult: 
+        return self.batch_query([query_text], top_k = top_k, similarity_threshold = similarity_threshold)[0] 
+
+    def _build_result(
+        self, 
+        query_text: str, 
+        results: Dict, 
+        similarity_threshold: float, 
+        retrieval_time: float 
+    ) -> RAGResult: 
         total_start = time.time() 
 
-        retrieval_start = time.time() 
-        results = self.vector_store.search_by_text(
-            query_text, 
-            self.embedder, 
-            top_k = top_k
-        ) 
+        documents = results['documents'] 
+        metadatas = results['metadatas'] 
+
+        # The vector store scores by cosine similarity already
+        similarities = np.asarray(results['scores'], dtype = np.float32) 
 
-        retrieval_time = (time.time() - retrieval_start) * 1000 
+        # Results come back closest first; the top match is always kept so there is some context
+        keep = similarities >= similarity_threshold 
+        if len(keep): 
+            keep[0] = True 
 
         sources = [] 
         context_chunks = [] 
 
-        for doc, metadata, distance in zip(
-            results['documents'], 
-            results['metadatas'], 
-            results['distances']
-        ): 
-
-            #Rough normalization since ChromaDB uses L2 Distance
-            similarity = 1 - (distance /2) 
-
-            if similarity >= similarity_threshold or len(sources) == 0: 
-                sources.append({
-                    'text': doc, 
-                    'title': metadata.get('title', 'Unknown'), 
-                    'source': metadata.get('source', 'Unknown'), 
-                    'chunk_index': metadata.get('chunk_index', 0), 
-                    'distance': distance, 
-                    'similarity': similarity 
-                })
-
-                context_chunks.append(doc) 
+        for i in np.flatnonzero(keep): 
+            metadata = metadatas[i] 
+            sources.append({
+                'text': documents[i], 
+                'title': metadata.get('title', 'Unknown'), 
+                'source': metadata.get('source', 'Unknown'), 
+                'chunk_index': metadata.get('chunk_index', 0), 
+                'similarity': float(similarities[i]) 
+            })
+
+            context_chunks.append(documents[i]) 
         generation_start = time.time() 
 
         if self.use_llm: 
@@ -79,7 +99,7 @@ class RAGPipeline:
             answer = self._generate_answer_without_llm(query_text, context_chunks) 
 
         generation_time = (time.time() - generation_start) * 1000 
-        total_time = (time.time() - total_start) * 1000 
+        total_time = retrieval_time + (time.time() - total_start) * 1000 
 
         return RAGResult(
             query = query_text,
@@ -90,6 +110,119 @@ class RAGPipeline:
             total_time_ms = total_time 
         )
     
+    def _retrieve_batch(self, query_texts: List[str], top_k: int) -> List[Dict]: 
+        """
+        Retrieve results for all queries with at most one embedding forward pass
+        and one vector store query, serving what it can from the query cache.
+        """
+        self._sync_cache_generation() 
+
+        keys = [hashlib.blake2b(q.encode('utf-8'), digest_size = 16).digest() for q in query_texts] 
+        embeddings = [None] * len(query_texts) 
+        results_by_k = [None] * len(query_texts) 
+        # Key of each missed query -> every position it occupies in this batch
+        misses = OrderedDict() 
+
+        for i, key in enumerate(keys): 
+            self._cache_lookups += 1 
+            slot = self._query_cache.get(key) 
+
+            if slot is None: 
+                if key in misses: 
+                    # Repeated within the batch, served by the first occurrence
+                    self._cache_hits += 1 
+                misses.setdefault(key, []).append(i) 
+            else: 
+                self._query_cache.move_to_end(key) 
+                self._cache_hits += 1 
+                # Copy, since the slot can be recycled by a miss later in this batch
+                embeddings[i] = self._cache_embeddings[slot].copy() 
+                results_by_k[i] = self._slot_results[slot] 
+
+        if misses: 
+            miss_embeddings = self.embedder.embed_batch(
+                [query_texts[positions[0]] for positions in misses.values()], 
+                batch_size = 32, 
+                show_progress = False 
+            ).astype(np.float32) 
+            norms = np.linalg.norm(miss_embeddings, axis = 1, keepdims = True) 
+            norms[norms == 0] = 1.0 
+            miss_embeddings = miss_embeddings / norms 
+
+            for (key, positions), embedding in zip(misses.items(), miss_embeddings): 
+                similar = self._find_similar_results(embedding) 
+
+                if similar is None: 
+                    similar = {} 
+                else: 
+                    self._cache_hits += 1 
+
+                for i in positions: 
+                    embeddings[i] = embedding 
+                    results_by_k[i] = similar 
+                self._cache_store(key, embedding, similar) 
+
+        pending = [i for i in range(len(query_texts)) if top_k not in results_by_k[i]] 
+        if pending: 
+            searched = self.vector_store.search(np.stack([embeddings[i] for i in pending]), top_k) 
+            for i, results in zip(pending, searched): 
+                results_by_k[i][top_k] = results 
+
+        return [r[top_k] for r in results_by_k] 
+
+    def _sync_cache_generation(self) -> None: 
+        """Forget cached search results if the vector store changed since they were fetched""" 
+        generation = self.vector_store.generation 
+        if generation == self._cache_generation: 
+            return 
+
+        # Near-duplicate queries share one results dict, so clear them in place
+        for results_by_k in self._slot_results: 
+            if results_by_k: 
+                results_by_k.clear() 
+
+        self._cache_generation = generation 
+
+    def _cache_store(self, key: bytes, embedding: np.ndarray, results_by_k: Dict) -> None: 
+        if self.query_cache_size <= 0: 
+            return 
+
+        if self._cache_embeddings is None: 
+            self._cache_embeddings = np.empty((self.query_cache_size, len(embedding)), dtype = np.float32) 
+
+        # Slots fill up in order, then the least recently used one is recycled,
+        # so the occupied slots are always the first len(self._query_cache) rows.
+        # A key that is already cached keeps its slot, otherwise that slot would be orphaned
+        if key in self._query_cache: 
+            slot = self._query_cache[key] 
+            self._query_cache.move_to_end(key) 
+        elif len(self._query_cache) < self.query_cache_size: 
+            slot = len(self._query_cache) 
+        else: 
+            _, slot = self._query_cache.popitem(last = False) 
+
+        self._cache_embeddings[slot] = embedding 
+        self._slot_results[slot] = results_by_k 
+        self._query_cache[key] = slot 
+
+    def _find_similar_results(self, embedding: np.ndarray) -> Optional[Dict]: 
+        """Return the cached results of a previous query whose embedding is nearly identical""" 
+        if not self._query_cache: 
+            return None 
+
+        similarities = self._cache_embeddings[:len(self._query_cache)] @ embedding 
+
+        best = int(np.argmax(similarities)) 
+        if similarities[best] >= self.query_cache_similarity: 
+            return self._slot_results[best] 
+
+        return None 
+
+    def clear_query_cache(self) -> None: 
+        """Drop all cached queries""" 
+        self._query_cache.clear() 
+        self._slot_results = [None] * self.query_cache_size 
+
     def _generate_answer_without_llm(
         self, 
         query: str, 
@@ -152,15 +285,22 @@ class RAGPipeline:
     def batch_query(
         self, 
         queries: List[str],
-        top_k: int = 5
+        top_k: int = 5, 
+        similarity_threshold: float = 0.7 
     ) -> List[RAGResult]: 
-        results = [] 
+        if not queries: 
+            return [] 
 
-        for query in queries: 
-            result = self.query(query, top_k = top_k) 
-            results.append(result) 
-        
-        return results 
+        retrieval_start = time.time() 
+        retrieved = self._retrieve_batch(queries, top_k) 
+
+        # Retrieval is shared across the batch, so attribute an equal share to each query
+        retrieval_time = (time.time() - retrieval_start) * 1000 / len(queries) 
+
+        return [
+            self._build_result(query, results, similarity_threshold, retrieval_time) 
+            for query, results in zip(queries, retrieved)
+        ]
     
     def performance(
         self, 
@@ -179,7 +319,8 @@ class RAGPipeline:
             'avg_generation_time_ms': sum(generation_times)/len(generation_times),
             'avg_total_time_ms': sum(total_times)/len(total_times),
             'max_total_time_ms': max(total_times),
-            'min_total_time_ms': min(total_times)
+            'min_total_time_ms': min(total_times),
+            'query_cache_hit_rate': self._cache_hits / self._cache_lookups if self._cache_lookups else 0.0
         }
     
 if __name__ == "__main__": 
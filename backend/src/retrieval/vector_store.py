@@ -1,10 +1,17 @@
-import chromadb 
-from chromadb.config import Settings 
-from typing import List, Dict, Optional
+import faiss 
+import json 
+import os 
+from typing import List, Dict, Optional, Union
 import numpy as np 
 from pathlib import Path 
 
 class VectorStore: 
+    """
+    Cosine similarity search over chunk embeddings with a flat FAISS inner-product index.
+    Vectors are L2-normalized on the way in, so inner product equals cosine similarity and
+    results are returned as 'scores' where higher is better. Documents, metadata and ids
+    are kept in lists parallel to the index rows.
+    """
     def __init__(
         self, 
         collection_name: str = "engineering_docs",
@@ -15,16 +22,70 @@ class VectorStore:
 
         self.persist_directory.mkdir(parents=True, exist_ok=True) 
 
-        print(f"Initializing ChromaDB at {self.persist_directory}")
+        self.index_path = self.persist_directory / f"{collection_name}.index" 
+        self.records_path = self.persist_directory / f"{collection_name}.json" 
 
-        self.client = chromadb.PersistentClient(path=str(self.persist_directory)) 
+        print(f"Initializing FAISS index at {self.persist_directory}")
 
-        self.collection = self.client.get_or_create_collection(
-            name = collection_name,
-            metadata = {"description": "Engineering documentation embeddings"} 
-        ) 
+        self.index = None 
+        self.ids = [] 
+        self.documents = [] 
+        self.metadatas = [] 
 
-        print(f"Collection '{collection_name}' ready with {self.collection.count()} created successfully")
+        # Suffix for new chunk ids. Persisted and never reused, so ids stay unique after deletes
+        self.next_id = 0 
+
+        # Bumped on every change to the stored chunks so callers can invalidate cached results
+        self.generation = 0 
+
+        if self.index_path.exists() and self.records_path.exists(): 
+            self._load() 
+
+        print(f"Collection '{collection_name}' ready with {self.count()} chunks")
+
+    def count(self) -> int: 
+        return len(self.ids) 
+
+    def _load(self) -> None: 
+        index = faiss.read_index(str(self.index_path)) 
+        with open(self.records_path, 'r', encoding='utf-8') as f: 
+            records = json.load(f) 
+
+        # The two files are replaced one after the other, so a crash in between leaves them out of step
+        if not (index.ntotal == len(records['ids']) == len(records['documents']) == len(records['metadatas'])): 
+            print(
+                f"Index has {index.ntotal} vectors but records hold {len(records['ids'])} chunks, "
+                f"ignoring the stored collection '{self.collection_name}'; rebuild it"
+            )
+            return 
+
+        self.index = index 
+        self.ids = records['ids'] 
+        self.documents = records['documents'] 
+        self.metadatas = records['metadatas'] 
+        self.next_id = records.get('next_id', len(self.ids)) 
+
+    def _save(self) -> None: 
+        if self.index is None: 
+            self.index_path.unlink(missing_ok=True) 
+            self.records_path.unlink(missing_ok=True) 
+            return 
+
+        # Write both files in full before swapping either in, so neither is ever left half-written
+        index_tmp = self.index_path.with_name(self.index_path.name + ".tmp") 
+        records_tmp = self.records_path.with_name(self.records_path.name + ".tmp") 
+
+        faiss.write_index(self.index, str(index_tmp)) 
+        with open(records_tmp, 'w', encoding='utf-8') as f: 
+            json.dump({
+                'ids': self.ids, 
+                'documents': self.documents, 
+                'metadatas': self.metadatas, 
+                'next_id': self.next_id 
+            }, f) 
+
+        os.replace(index_tmp, self.index_path) 
+        os.replace(records_tmp, self.records_path) 
 
     def add_chunks(
         self, 
@@ -37,68 +98,83 @@ class VectorStore:
         
         print(f"\nAdding {len(chunks)} chunks to the vector store...") 
 
-        ids = [] 
-        documents = [] 
-        metadatas = [] 
-        embeddings_list = [] 
+        # Embeddings arrive as float16, FAISS needs contiguous float32 (normalized in place)
+        embeddings = np.array(embeddings, dtype = np.float32, order = 'C') 
+        faiss.normalize_L2(embeddings) 
 
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)): 
+        if self.index is None: 
+            self.index = faiss.IndexFlatIP(embeddings.shape[1]) 
 
-            chunk_id = f"{chunk.metadata.get('title', 'Unknown')}_{chunk.chunk_index}_{i}" 
-            chunk_id = chunk_id.replace(" ", "_").replace('/', '_')
+        offset = self.next_id 
+        self.next_id += len(chunks) 
 
-            ids.append(chunk_id) 
-            documents.append(chunk.text)
-
-            metadata = {
+        self.ids.extend(
+            f"{chunk.metadata.get('title', 'Unknown')}_{chunk.chunk_index}_{offset + i}".replace(" ", "_").replace('/', '_')
+            for i, chunk in enumerate(chunks)
+        )
+        self.documents.extend(chunk.text for chunk in chunks) 
+        self.metadatas.extend(
+            {
                 'title': str(chunk.metadata.get('title', 'Unknown')),
                 'source': str(chunk.metadata.get('source', 'Unknown')),
                 'chunk_index': chunk.chunk_index,
                 'chunk_size': len(chunk.text)
             }
+            for chunk in chunks
+        )
 
-            metadatas.append(metadata) 
-            embeddings_list.append(embedding.tolist()) 
-
-        batch_size = 100 
-
-        for i in range(0, len(ids), batch_size): 
-            batch_end = min(i+batch_size, len(ids)) 
-
-            self.collection.add(
-                ids = ids[i:batch_end],
-                documents = documents[i:batch_end],
-                metadatas = metadatas[i:batch_end],
-                embeddings = embeddings_list[i:batch_end]
-            )
-
-            print(f"Added {batch_end-i} chunks to the vector store") 
+        self.index.add(embeddings) 
+        self.generation += 1 
+        self._save() 
 
         print(f"\n{'='*60}") 
-        print(f"Successfully added {len(ids)} chunks to the vector store") 
-        print(f"Total chunks added: {len(ids)}") 
+        print(f"Successfully added {len(chunks)} chunks to the vector store") 
+        print(f"Total chunks stored: {self.count()}") 
 
+    def _matches(self, metadata: Dict, filter_metadata: Dict) -> bool: 
+        return all(metadata.get(k) == v for k, v in filter_metadata.items()) 
 
     def search(
         self, 
         query_embedding: np.ndarray,
         top_k: int = 5, 
         filter_metadata: Optional[Dict] = None
-    ) -> Dict: 
-
-        query_embedding_list = query_embedding.tolist() 
-        results = self.collection.query(
-            query_embeddings = [query_embedding_list], 
-            n_results = top_k,
-            where = filter_metadata
-        )
-
-        return { 
-            'documents': results['documents'][0],
-            'metadatas': results['metadatas'][0],
-            'distances': results['distances'][0],
-            'ids': results['ids'][0]
-        }
+    ) -> Union[Dict, List[Dict]]: 
+        """
+        Search with a single (dim,) embedding, returning one result dict, or with a
+        (B, dim) batch in one index search, returning a list of B result dicts.
+
+        filter_metadata is an equality match on metadata fields, applied after scoring.
+        """
+        single = query_embedding.ndim == 1 
+        query_embeddings = np.array(query_embedding[None] if single else query_embedding, dtype = np.float32, order = 'C') 
+
+        if self.index is None or self.count() == 0: 
+            empty = [{'documents': [], 'metadatas': [], 'scores': [], 'ids': []} for _ in range(len(query_embeddings))] 
+            return empty[0] if single else empty 
+
+        faiss.normalize_L2(query_embeddings) 
+
+        # Filtering happens after the search, so score everything when a filter is given
+        k = self.count() if filter_metadata else min(top_k, self.count()) 
+        scores, indices = self.index.search(query_embeddings, k) 
+
+        batch_results = [] 
+
+        for row_scores, row_indices in zip(scores, indices): 
+            hits = [
+                (score, idx) for score, idx in zip(row_scores.tolist(), row_indices.tolist()) 
+                if idx >= 0 and (not filter_metadata or self._matches(self.metadatas[idx], filter_metadata))
+            ][:top_k] 
+
+            batch_results.append({ 
+                'documents': [self.documents[idx] for _, idx in hits],
+                'metadatas': [self.metadatas[idx] for _, idx in hits],
+                'scores': [score for score, _ in hits],
+                'ids': [self.ids[idx] for _, idx in hits]
+            })
+
+        return batch_results[0] if single else batch_results 
     
     def search_by_text(
         self, 
@@ -111,34 +187,44 @@ class VectorStore:
         return self.search(query_embedding, top_k) 
     
     def get_stats(self) -> Dict: 
-        count = self.collection.count() 
+        count = self.count() 
 
         if count == 0: 
             return {'total_documents': 0}
-        
-        sample = self.collection.peek(limit=1) 
 
         return { 
             'collection_name': self.collection_name, 
             'total_documents': count, 
             'persist_directory': str(self.persist_directory),
-            'sample_metadata': sample['metadatas'][0] if sample['metadatas'] else {}
+            'sample_metadata': self.metadatas[0]
         }
     
     def clear(self) -> None: 
-        self.client.delete_collection(self.collection_name) 
-        self.collection = self.client.get_or_create_collection(
-            name = self.collection_name,
-            metadata = {"description": "Engineering documentation embeddings"}
-        )
+        self.index = None 
+        self.ids = [] 
+        self.documents = [] 
+        self.metadatas = [] 
+        self.generation += 1 
+        self._save() 
 
         print(f"Collection '{self.collection_name}' cleared successfully") 
 
     def delete_by_filter(self, filter_metadata: Dict) -> None: 
-        results = self.collection.get(where = filter_metadata) 
-        if results['ids']: 
-            self.collection.delete(ids = results['ids']) 
-            print(f"Deleted {len(results['ids'])} documents") 
+        positions = [i for i, metadata in enumerate(self.metadatas) if self._matches(metadata, filter_metadata)] 
+        if not positions: 
+            return 
+
+        # IndexFlat compacts remaining rows in order, so the parallel lists stay aligned
+        self.index.remove_ids(np.array(positions, dtype = np.int64)) 
+
+        removed = set(positions) 
+        self.ids = [x for i, x in enumerate(self.ids) if i not in removed] 
+        self.documents = [x for i, x in enumerate(self.documents) if i not in removed] 
+        self.metadatas = [x for i, x in enumerate(self.metadatas) if i not in removed] 
+        self.generation += 1 
+        self._save() 
+
+        print(f"Deleted {len(positions)} documents") 
 
 if __name__ == "__main__": 
     import sys
@@ -151,15 +237,10 @@ if __name__ == "__main__":
     print("BUILDING VECTOR STORE") 
     print(f"{'='*60}") 
 
-    print("\nStep 1: Loading documents...") 
+    print("\nStep 1-2: Loading and chunking documents...") 
     loader = DocumentLoader() 
-    documents = loader.load_directory() 
-
-    print(f"\nLoaded {len(documents)} documents") 
-
-    print("\nStep 2: Chunking documents...") 
     chunker = TextChunker(chunk_size = 512, chunk_overlap = 50)
-    chunks = chunker.chunk_documents(documents) 
+    chunks = loader.load_directory_chunks(chunker) 
 
     print(f"\nChunked into {len(chunks)} chunks") 
 
@@ -172,7 +253,7 @@ if __name__ == "__main__":
     print("\nStep 4: Building vector store...") 
     vector_store = VectorStore(collection_name = "engineering_docs")
 
-    if vector_store.collection.count()>0: 
+    if vector_store.count()>0: 
         print("\nClearing existing vector store...") 
         vector_store.clear() 
 
@@ -192,12 +273,12 @@ if __name__ == "__main__":
         
         results = vector_store.search_by_text(query, embedder, top_k=3)
         
-        for i, (doc, metadata, distance) in enumerate(zip(
+        for i, (doc, metadata, score) in enumerate(zip(
             results['documents'],
             results['metadatas'],
-            results['distances']
+            results['scores']
         )):
-            print(f"\nResult {i+1} (distance: {distance:.4f}):")
+            print(f"\nResult {i+1} (score: {score:.4f}):")
             print(f"Source: {metadata['title']}")
             print(f"Text preview: {doc[:150]}...")
     
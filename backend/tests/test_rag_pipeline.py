@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / 'src' / 'retrieval'))
+from rag_pipeline import RAGPipeline
+
+
+VECTORS = {
+    'a': np.array([1, 0, 0, 0], dtype=np.float32),
+    'b': np.array([0, 1, 0, 0], dtype=np.float32),
+    'c': np.array([0, 0, 1, 0], dtype=np.float32),
+}
+
+
+class StubEmbedder:
+    def __init__(self):
+        self.encoded = []
+
+    def embed_batch(self, texts, batch_size=32, show_progress=True):
+        self.encoded.extend(texts)
+        return np.stack([VECTORS[t] for t in texts])
+
+
+class StubVectorStore:
+    """Returns the document named after the query vector's nearest axis"""
+    generation = 0
+
+    def search(self, query_embedding, top_k=5):
+        names = list(VECTORS)
+        return [
+            {'documents': [f"doc-{names[int(np.argmax(e))]}"], 'metadatas': [{}], 'scores': [1.0], 'ids': ['0']}
+            for e in query_embedding
+        ]
+
+
+def test_duplicate_query_in_batch_is_embedded_once():
+    embedder = StubEmbedder()
+    pipeline = RAGPipeline(StubVectorStore(), embedder)
+
+    results = pipeline.batch_query(['a', 'a'])
+
+    assert embedder.encoded == ['a']
+    assert [r.sources[0]['text'] for r in results] == ['doc-a', 'doc-a']
+
+
+def test_duplicate_query_in_batch_does_not_orphan_cache_slot():
+    pipeline = RAGPipeline(StubVectorStore(), StubEmbedder())
+
+    pipeline.batch_query(['a', 'a'])
+    pipeline.batch_query(['b'])
+
+    assert pipeline.query('a').sources[0]['text'] == 'doc-a'
+    assert pipeline.query('b').sources[0]['text'] == 'doc-b'
+
+
+def test_lru_eviction_keeps_slots_consistent():
+    pipeline = RAGPipeline(StubVectorStore(), StubEmbedder(), query_cache_size=2)
+
+    pipeline.batch_query(['a', 'b'])
+    pipeline.batch_query(['c', 'c'])
+
+    assert pipeline.query('c').sources[0]['text'] == 'doc-c'
+    assert pipeline.query('a').sources[0]['text'] == 'doc-a'